@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse, PlainTextResponse
 import spotify.auth as auth
@@ -8,7 +9,14 @@ CLIENT_SECRET = env["CLIENT_SECRET"]
 REDIRECT_URI = env["REDIRECT_URI"]
 PORT = env["PORT"]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    try:
+        yield
+    finally:
+        await auth.close_accounts_client()
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/login")
 def login():
@@ -0,0 +1,86 @@
+import os
+import types
+from pathlib import Path
+
+# Load a small static env file instead of searching for .env; must be set
+# before spotify.auth is imported (load_env is cached). Point it at a real
+# .env to use --run-live with real credentials.
+os.environ.setdefault("SPOTIFY_ENV_FILE", str(Path(__file__).parent / "fixtures" / ".env.test"))
+
+import httpx
+import pytest
+import pytest_asyncio
+
+import spotify.auth as auth
+from spotify.constants import SPOTIFY_ACCOUNTS
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-live", action="store_true", default=False,
+        help="run tests that talk to the real Spotify API",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "live: test performs real network calls to Spotify")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-live"):
+        return
+    skip_live = pytest.mark.skip(reason="needs --run-live")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
+
+
+@pytest.fixture(scope="session")
+def env():
+    return auth.load_env()
+
+
+@pytest.fixture(scope="session")
+def test_secrets():
+    return types.SimpleNamespace(
+        refresh_token=os.environ.get("SPOTIFY_REFRESH_TOKEN", "dummy_refresh"),
+    )
+
+
+@pytest.fixture
+def tokens_path(monkeypatch, tmp_path):
+    # point tokens.json at tmp_path and start from an empty in-memory token cache
+    path = tmp_path / "tokens.json"
+    monkeypatch.setattr(auth, "TOKENS_PATH", str(path))
+    monkeypatch.setattr(auth, "_tokens_mem", None)
+    monkeypatch.setattr(auth, "_tokens_mtime", None)
+    monkeypatch.setattr(auth, "_tokens_checked_at", float("-inf"))
+    return path
+
+
+@pytest.fixture
+def preserve_tokens():
+    # live tests may overwrite the real tokens.json: move it aside, restore after
+    path = Path(auth.TOKENS_PATH)
+    backup = path.with_suffix(".bak")
+    try:
+        path.rename(backup)
+        moved = True
+    except FileNotFoundError:
+        moved = False
+    yield
+    if moved:
+        backup.replace(path)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client():
+    # one connection pool for the whole run (the event loop is session-scoped too)
+    async with httpx.AsyncClient(base_url=SPOTIFY_ACCOUNTS, http2=True) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def accounts_client(monkeypatch, http_client):
+    monkeypatch.setattr(auth, "_accounts_client", http_client)
+    return http_client
@@ -1,10 +1,12 @@
 # server.py
 """Spotify MCP Server - main entry point."""
 
+import asyncio
+
 from mcp.server.fastmcp import FastMCP
 
 import spotify.auth as sa
-from spotify.client import initialize_client
+from spotify.client import close_client, initialize_client
 from spotify.resources import register_resources
 from spotify.tools import register_tools
 
@@ -26,4 +28,41 @@ def create_server() -> FastMCP:
     
     return mcp
 
-mcp = create_server()
+def get_mcp() -> FastMCP:
+    """Construct a fresh server instance on demand (e.g. from tests)."""
+    return create_server()
+
+
+_mcp: FastMCP | None = None
+
+
+def __getattr__(name: str):
+    # `mcp run server.py` looks up a module-level `mcp`; build it on first
+    # access rather than as an import-time side effect.
+    global _mcp
+    if name == "mcp":
+        if _mcp is None:
+            _mcp = create_server()
+        return _mcp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def serve(mcp: FastMCP) -> None:
+    """
+    Run the server over stdio, closing the pooled HTTP clients on exit.
+    
+    The clients are process-wide, so they are closed here once the server
+    stops rather than in a FastMCP lifespan, which runs per session.
+    `mcp run server.py` goes through the module-level `mcp` instead and
+    never closes them; they are only released when the process exits.
+    """
+    try:
+        await mcp.run_stdio_async()
+    finally:
+        await close_client()
+        await sa.close_accounts_client()
+
+
+if __name__ == "__main__":
+    mcp = get_mcp()
+    asyncio.run(serve(mcp))
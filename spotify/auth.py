@@ -1,43 +1,135 @@
 import os
 import json
+import asyncio
 import time
 import base64
-from typing import Optional
+import contextlib
+import functools
+import tempfile
+from types import MappingProxyType
+from typing import Mapping, Optional
 from urllib.parse import urlencode
 import httpx
-from spotify.constants import TOKENS_PATH
+from spotify.constants import SPOTIFY_ACCOUNTS, TOKENS_PATH
 
 SCOPES = "user-modify-playback-state user-read-playback-state user-read-currently-playing"
 
-# Environment loading (dotenv optional)
-def load_env():
+# Refresh this long before expiry so requests never go out with a dying token
+REFRESH_SKEW_SECONDS = 60
+
+# Shared connection pool for accounts.spotify.com - created lazily on first use
+_accounts_client: Optional[httpx.AsyncClient] = None
+
+# In-memory copy of tokens.json so the request path doesn't hit the disk;
+# reloaded when the file's mtime changes (e.g. login from the auth server)
+_tokens_mem: Optional[dict] = None
+_tokens_mtime: Optional[int] = None
+# How often the request path stats tokens.json for changes made by another process
+TOKENS_RECHECK_SECONDS = 5
+_tokens_checked_at = float("-inf")
+
+# Environment loading (dotenv optional) - parsed once per process.
+# SPOTIFY_ENV_FILE names the file to load and skips searching for .env.
+@functools.lru_cache(maxsize=1)
+def load_env() -> Mapping:
     try:
         from dotenv import load_dotenv
-        load_dotenv()
+        load_dotenv(os.getenv("SPOTIFY_ENV_FILE"))
     except ImportError:
         pass
     
-    return {
+    # read-only view, since every caller shares the cached result
+    return MappingProxyType({
         "CLIENT_ID": os.getenv("SPOTIFY_CLIENT_ID"),
         "CLIENT_SECRET": os.getenv("SPOTIFY_CLIENT_SECRET"),
         "REDIRECT_URI": os.getenv("SPOTIFY_REDIRECT_URI", "http://127.0.0.1:8787/callback"),
         "PORT": int(os.getenv("PORT", "8787")),
-    }
+    })
+
+def _file_mtime() -> Optional[int]:
+    try:
+        return os.stat(TOKENS_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
 
 def save_tokens(data: dict):
-    with open(TOKENS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    global _tokens_mem, _tokens_mtime
+    _tokens_mem = data
+    # single buffered write to a temp file, then an atomic rename over tokens.json
+    # so a concurrent reader sees either the old file or the new one, never a torn one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(TOKENS_PATH) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(data, separators=(",", ":")).encode())
+            f.flush()
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(tmp_path, TOKENS_PATH)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    # rename keeps the inode, so this is the mtime tokens.json now carries
+    _tokens_mtime = mtime
 
 def load_tokens() -> Optional[dict]:
-    if not os.path.exists(TOKENS_PATH):
+    global _tokens_mem, _tokens_mtime
+    try:
+        f = open(TOKENS_PATH, "r", encoding="utf-8")
+    except FileNotFoundError:
+        _tokens_mem, _tokens_mtime = None, None
         return None
-    with open(TOKENS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with f:
+        # mtime of the file actually opened, so a rename racing this read is still
+        # seen as a change next time; only cached once the contents parsed
+        mtime = os.fstat(f.fileno()).st_mtime_ns
+        data = json.load(f)
+    _tokens_mem, _tokens_mtime = data, mtime
+    return data
+
+async def current_tokens() -> Optional[dict]:
+    # stat at most once per TOKENS_RECHECK_SECONDS while the cached token is good;
+    # the file is only re-read (in a worker thread) when it changed
+    global _tokens_checked_at
+    now = time.monotonic()
+    if _tokens_mem is not None:
+        if now - _tokens_checked_at < TOKENS_RECHECK_SECONDS and not need_refresh(_tokens_mem):
+            return _tokens_mem
+        _tokens_checked_at = now
+        if _file_mtime() == _tokens_mtime:
+            return _tokens_mem
+    tokens = await asyncio.to_thread(load_tokens)
+    _tokens_checked_at = now
+    return tokens
+
+def get_accounts_client() -> httpx.AsyncClient:
+    global _accounts_client
+    if _accounts_client is None or _accounts_client.is_closed:
+        # token refreshes are rare, so keep a couple of connections alive for longer
+        _accounts_client = httpx.AsyncClient(
+            base_url=SPOTIFY_ACCOUNTS,
+            timeout=httpx.Timeout(connect=3.0, read=5.0, write=5.0, pool=5.0),
+            limits=httpx.Limits(max_keepalive_connections=2, keepalive_expiry=300),
+        )
+    return _accounts_client
+
+async def close_accounts_client():
+    global _accounts_client
+    if _accounts_client is not None:
+        await _accounts_client.aclose()
+        _accounts_client = None
 
 def b64_client_creds(client_id, client_secret) -> str:
     raw = f"{client_id}:{client_secret}".encode()
     return base64.b64encode(raw).decode()
 
+# credentials are fixed for the process, so build the token endpoint headers once
+@functools.lru_cache(maxsize=4)
+def _token_headers(client_id, client_secret) -> Mapping[str, str]:
+    return MappingProxyType({
+        "Authorization": f"Basic {b64_client_creds(client_id, client_secret)}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    })
+
 def build_login_url(client_id, redirect_uri, scopes=SCOPES):
     params = {
         "response_type": "code",
@@ -45,23 +137,18 @@ def build_login_url(client_id, redirect_uri, scopes=SCOPES):
         "scope": scopes,
         "redirect_uri": redirect_uri,
     }
-    return "https://accounts.spotify.com/authorize?" + urlencode(params)
+    return f"{SPOTIFY_ACCOUNTS}/authorize?" + urlencode(params)
 
 async def exchange_code_for_token(code, client_id, client_secret, redirect_uri, scopes=SCOPES):
-    token_url = "https://accounts.spotify.com/api/token"
-    headers = {
-        "Authorization": f"Basic {b64_client_creds(client_id, client_secret)}",
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
+    headers = _token_headers(client_id, client_secret)
     data = {
         "grant_type": "authorization_code",
         "code": code,
         "redirect_uri": redirect_uri,
     }
-    async with httpx.AsyncClient() as client:
-        r = await client.post(token_url, data=data, headers=headers)
-        r.raise_for_status()
-        tok = r.json()
+    r = await get_accounts_client().post("/api/token", data=data, headers=headers)
+    r.raise_for_status()
+    tok = r.json()
     expires_at = int(time.time()) + int(tok["expires_in"])
     tokens = {
         "access_token": tok["access_token"],
@@ -69,35 +156,32 @@ async def exchange_code_for_token(code, client_id, client_secret, redirect_uri,
         "expires_at": expires_at,
         "scopes": scopes,
     }
-    save_tokens(tokens)
+    await asyncio.to_thread(save_tokens, tokens)
     return tokens
 
 def need_refresh(tokens: dict) -> bool:
-    return int(time.time()) > int(tokens["expires_at"]) - 10
+    return int(tokens["expires_at"]) - REFRESH_SKEW_SECONDS <= time.time()
 
 async def refresh_access_token(tokens, client_id, client_secret):
-    token_url = "https://accounts.spotify.com/api/token"
-    headers = {
-        "Authorization": f"Basic {b64_client_creds(client_id, client_secret)}",
-        "Content-Type": "application/x-www-form-urlencoded",
-    }
+    headers = _token_headers(client_id, client_secret)
     data = {
         "grant_type": "refresh_token",
         "refresh_token": tokens["refresh_token"],
     }
-    async with httpx.AsyncClient() as client:
-        r = await client.post(token_url, data=data, headers=headers)
-        r.raise_for_status()
-        newtok = r.json()
+    r = await get_accounts_client().post("/api/token", data=data, headers=headers)
+    r.raise_for_status()
+    newtok = r.json()
     tokens["access_token"] = newtok["access_token"]
     tokens["expires_at"] = int(time.time()) + int(newtok["expires_in"])
     if newtok.get("refresh_token"):
         tokens["refresh_token"] = newtok["refresh_token"]
-    save_tokens(tokens)
+    await asyncio.to_thread(save_tokens, tokens)
     return tokens["access_token"]
 
-async def get_access_token(client_id, client_secret):
-    tokens = load_tokens()
+async def get_access_token(client_id, client_secret, tokens: Optional[dict] = None):
+    # callers that already hold the current tokens pass them to skip another lookup
+    if tokens is None:
+        tokens = await current_tokens()
     if not tokens:
         raise RuntimeError("Not authorized yet. Visit /login first.")
     if not need_refresh(tokens):
@@ -1,6 +1,9 @@
 # spotify/client.py
 """HTTP client and API utilities for Spotify Web API."""
 
+import asyncio
+import math
+import time
 from typing import Any, Dict
 
 import httpx
@@ -13,6 +16,25 @@ from . import auth as sa
 CLIENT_ID: str = ""
 CLIENT_SECRET: str = ""
 
+# Shared connection pool for api.spotify.com - created lazily on first request
+_client: httpx.AsyncClient | None = None
+
+# Bearer headers are reused while the in-memory access token is unchanged
+# and not yet due for a refresh
+_cached_headers: Dict[str, str] | None = None
+_cached_token: str | None = None
+_headers_lock = asyncio.Lock()
+
+# Cleared while Spotify has told us to back off (HTTP 429); every request waits on it
+_rate_gate = asyncio.Event()
+_rate_gate.set()
+MAX_RATE_LIMIT_RETRIES = 3
+# Longer back-offs are returned to the caller rather than stalling every tool call
+MAX_RETRY_AFTER_SECONDS = 10
+# monotonic deadline of such a long back-off; until then requests get a 429
+# straight away without reaching Spotify
+_blocked_until = 0.0
+
 
 def initialize_client(client_id: str, client_secret: str) -> None:
     """Initialize the client with credentials."""
@@ -21,10 +43,73 @@ def initialize_client(client_id: str, client_secret: str) -> None:
     CLIENT_SECRET = client_secret
 
 
+def get_client() -> httpx.AsyncClient:
+    """Get the pooled Spotify API client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=SPOTIFY_API,
+            http2=True,  # multiplex concurrent tool calls over one connection
+            timeout=httpx.Timeout(connect=3.0, read=5.0, write=5.0, pool=5.0),
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the pooled Spotify API client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def bearer_headers() -> Dict[str, str]:
     """Get authorization headers with current access token."""
-    token = await sa.get_access_token(CLIENT_ID, CLIENT_SECRET)
-    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    global _cached_headers, _cached_token
+    tokens = await sa.current_tokens()
+    if (
+        _cached_headers is not None
+        and tokens is not None
+        and tokens["access_token"] == _cached_token
+        and not sa.need_refresh(tokens)
+    ):
+        return _cached_headers
+    # Concurrent callers wait here so an expired token is refreshed only once;
+    # later waiters find the refreshed token in memory. Look the tokens up again
+    # under the lock: the snapshot above may be an expired dict that a refresh
+    # or a reload of tokens.json has since replaced.
+    async with _headers_lock:
+        tokens = await sa.current_tokens()
+        token = await sa.get_access_token(CLIENT_ID, CLIENT_SECRET, tokens)
+        if token != _cached_token:
+            _cached_headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+            _cached_token = token
+        return _cached_headers
+
+
+def _retry_after_seconds(r: httpx.Response) -> float:
+    """Parse the Retry-After header (seconds), defaulting to 1s."""
+    try:
+        return max(float(r.headers.get("Retry-After", 1)), 0.0)
+    except ValueError:
+        return 1.0
+
+
+def _blocked_response(method: str, path: str, remaining: float) -> httpx.Response:
+    """Build the 429 returned while a long Retry-After is in force."""
+    return httpx.Response(
+        429,
+        headers={"Retry-After": str(math.ceil(remaining))},
+        request=get_client().build_request(method, path),
+    )
+
+
+def _pause_requests(delay: float) -> None:
+    """Hold all requests until Spotify's rate-limit window has passed."""
+    if _rate_gate.is_set():
+        _rate_gate.clear()
+        asyncio.get_running_loop().call_later(delay, _rate_gate.set)
 
 
 async def spotify_request(
@@ -34,9 +119,28 @@ async def spotify_request(
     params: dict | None = None, 
     json_body: Any | None = None
 ) -> httpx.Response:
-    """Make an authenticated request to the Spotify API."""
+    """
+    Make an authenticated request to the Spotify API.
+    
+    On 429 all requests pause for Retry-After seconds and this one is retried
+    (up to MAX_RATE_LIMIT_RETRIES times) before the 429 is returned. A
+    Retry-After above MAX_RETRY_AFTER_SECONDS returns the 429 straight away,
+    and every request until it has passed gets a 429 without being sent.
+    """
+    global _blocked_until
     headers = await bearer_headers()
-    url = f"{SPOTIFY_API}{path}"
-    async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, connect=5.0)) as client:
-        r = await client.request(method, url, headers=headers, params=params, json=json_body)
-        return r
+    retries = 0
+    while True:
+        await _rate_gate.wait()
+        remaining = _blocked_until - time.monotonic()
+        if remaining > 0:
+            return _blocked_response(method, path, remaining)
+        r = await get_client().request(method, path, headers=headers, params=params, json=json_body)
+        if r.status_code != 429 or retries >= MAX_RATE_LIMIT_RETRIES:
+            return r
+        delay = _retry_after_seconds(r)
+        if delay > MAX_RETRY_AFTER_SECONDS:
+            _blocked_until = max(_blocked_until, time.monotonic() + delay)
+            return r
+        retries += 1
+        _pause_requests(delay)
@@ -1,2 +1,3 @@
 SPOTIFY_API = "https://api.spotify.com/v1"
+SPOTIFY_ACCOUNTS = "https://accounts.spotify.com"
 TOKENS_PATH = "data/tokens.json"
\ No newline at end of file
@@ -1,11 +1,23 @@
 # spotify/devices.py
 """Device management and caching for Spotify devices."""
 
+import asyncio
+import logging
 import time
 from typing import List, NamedTuple, Optional
 
+import httpx
+import orjson
+
 from .client import spotify_request
 
+logger = logging.getLogger(__name__)
+
+# Expected failures of a refresh or player lookup nobody is waiting on; the
+# stale entry keeps being served (ValueError: a 200 with a non-JSON body).
+# Anything else is a bug and gets logged.
+_REFRESH_ERRORS = (RuntimeError, ValueError, httpx.HTTPError)
+
 
 class DeviceInfo(NamedTuple):
     """Information about a Spotify playback device."""
@@ -17,25 +29,57 @@ class DeviceInfo(NamedTuple):
 
 
 class DevicesCache:
-    """Cache for Spotify devices to minimize API calls."""
+    """
+    Cache for Spotify devices to minimize API calls.
     
-    def __init__(self, ttl_seconds: int = 10):
-        self.ttl_seconds = ttl_seconds
+    Entries older than soft_ttl are still served but trigger a background
+    refresh; only entries older than hard_ttl make the caller wait.
+    """
+    
+    def __init__(self, soft_ttl: int = 8, hard_ttl: int = 30):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
         self._devices: List[DeviceInfo] = []
+        self._active_id: Optional[str] = None
+        self._devices_json: bytes = b"[]"
         self._last_fetch: float = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._player_task: Optional[asyncio.Task] = None
+    
+    def is_stale(self) -> bool:
+        """Check if the cache is past its soft TTL and should be refreshed."""
+        return time.time() - self._last_fetch >= self.soft_ttl
     
     def is_expired(self) -> bool:
-        """Check if the cache has expired."""
-        return time.time() - self._last_fetch > self.ttl_seconds
+        """Check if the cache is past its hard TTL and can no longer be served."""
+        return time.time() - self._last_fetch >= self.hard_ttl
     
     def update(self, devices: List[DeviceInfo]) -> None:
         """Update the cache with new device data."""
         self._devices = devices
+        # Resolve active (or first available) device once per refresh
+        self._active_id = next(
+            (d.id for d in devices if d.is_active),
+            devices[0].id if devices else None,
+        )
+        # Render once per refresh so the devices resource is a plain bytes read
+        self._devices_json = orjson.dumps(
+            [d._asdict() for d in devices], option=orjson.OPT_INDENT_2
+        )
         self._last_fetch = time.time()
     
     def get_devices(self) -> List[DeviceInfo]:
-        """Get a copy of cached devices."""
-        return self._devices.copy()
+        """Get cached devices (shared list - callers must not mutate it)."""
+        return self._devices
+    
+    def get_active_id(self) -> Optional[str]:
+        """Get the cached active device ID (or first device if none is active)."""
+        return self._active_id
+    
+    @property
+    def json_bytes(self) -> bytes:
+        """Cached devices as indented JSON, rendered at update time."""
+        return self._devices_json
 
 
 # Global cache instance
@@ -47,14 +91,29 @@ async def fetch_devices_data() -> List[DeviceInfo]:
     Fetch devices from Spotify API and return structured data.
     Includes caching to avoid redundant API calls.
     """
+    if not _devices_cache.is_stale():
+        return _devices_cache.get_devices()
+    
     if not _devices_cache.is_expired():
+        # Serve stale data now; concurrent stale reads share one refresh
+        _start_refresh()
         return _devices_cache.get_devices()
     
+    # Concurrent expired reads share one refresh (also one already running in
+    # the background) and all get its result or its error
+    return await asyncio.shield(_start_refresh())
+
+
+async def _refresh_devices() -> List[DeviceInfo]:
+    """Fetch devices from the Spotify API and update the cache."""
     r = await spotify_request("GET", "/me/player/devices")
     if r.status_code != 200:
         raise RuntimeError(f"devices API failed: {r.status_code} {r.text}")
     
-    raw_devices = r.json().get("devices", []) or []
+    payload = orjson.loads(r.content)
+    raw_devices = (payload.get("devices") or []) if isinstance(payload, dict) else None
+    if not isinstance(raw_devices, list) or not all(isinstance(d, dict) for d in raw_devices):
+        raise RuntimeError(f"devices API returned an unexpected payload: {r.text}")
     devices = [
         DeviceInfo(
             id=d.get("id", ""),
@@ -71,26 +130,102 @@ async def fetch_devices_data() -> List[DeviceInfo]:
     return devices
 
 
+def _start_refresh() -> asyncio.Task:
+    """Start a cache refresh unless one is already running."""
+    task = _devices_cache._refresh_task
+    if task is None:
+        task = asyncio.create_task(_refresh_devices())
+        task.add_done_callback(_refresh_done)
+        _devices_cache._refresh_task = task
+    return task
+
+
+def _refresh_done(task: asyncio.Task) -> None:
+    """Clear a finished refresh and retrieve its error so a background one stays quiet."""
+    if _devices_cache._refresh_task is task:
+        _devices_cache._refresh_task = None
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and not isinstance(exc, _REFRESH_ERRORS):
+        logger.error("devices refresh failed", exc_info=exc)
+
+
+async def fetch_devices_json() -> bytes:
+    """Fetch devices (cached) as pre-rendered JSON bytes."""
+    await fetch_devices_data()
+    return _devices_cache.json_bytes
+
+
 async def get_active_device_id() -> Optional[str]:
     """
     Get the ID of the active device, or the first available device if none is active.
     Uses cached device data to minimize API calls.
     """
-    try:
-        devices = await fetch_devices_data()
-        if not devices:
-            return None
-        
-        # Find active device first
-        active_device = next((d for d in devices if d.is_active), None)
-        if active_device:
-            return active_device.id
-        
-        # Fall back to first device if no active device
-        return devices[0].id
-    except RuntimeError:
-        # Re-raise with more context for device-specific failures
-        raise
+    await fetch_devices_data()
+    return _devices_cache.get_active_id()
+
+
+async def _player_device_id() -> Optional[str]:
+    """Get the current playback device ID from GET /me/player, if any."""
+    r = await spotify_request("GET", "/me/player")
+    if r.status_code != 200:
+        return None
+    player = orjson.loads(r.content)
+    device = player.get("device") if isinstance(player, dict) else None
+    return device.get("id") if isinstance(device, dict) else None
+
+
+def _start_player_lookup() -> asyncio.Task:
+    """Start a GET /me/player lookup unless one is already running."""
+    task = _devices_cache._player_task
+    if task is None:
+        task = asyncio.create_task(_player_device_id())
+        task.add_done_callback(_player_lookup_done)
+        _devices_cache._player_task = task
+    return task
+
+
+def _player_lookup_done(task: asyncio.Task) -> None:
+    """Clear a finished lookup; its errors only mean falling back to the devices list."""
+    if _devices_cache._player_task is task:
+        _devices_cache._player_task = None
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and not isinstance(exc, _REFRESH_ERRORS):
+        logger.error("player lookup failed", exc_info=exc)
+
+
+async def resolve_active_device_id() -> Optional[str]:
+    """
+    Like get_active_device_id, but on a cold cache races the devices list
+    against GET /me/player and uses whichever yields a device first.
+    The devices fetch always runs to completion so the cache gets warmed,
+    and concurrent cold calls share both in-flight requests.
+    """
+    if not _devices_cache.is_expired():
+        return await get_active_device_id()
+    
+    refresh_task = _start_refresh()
+    player_task = _start_player_lookup()
+    done, _ = await asyncio.wait(
+        (refresh_task, player_task), return_when=asyncio.FIRST_COMPLETED
+    )
+    if (
+        player_task in done
+        and not player_task.cancelled()
+        and player_task.exception() is None
+        and player_task.result()
+    ):
+        # Leave the refresh running in the background to fill the cache
+        return player_task.result()
+    
+    # Devices list won (or the player had no device) - it is authoritative;
+    # wait for that same refresh and raise its error rather than fetching again.
+    # The player lookup is shared with other callers, so it is left to finish.
+    await asyncio.shield(refresh_task)
+    return _devices_cache.get_active_id()
 
 
 async def invalidate_devices_cache() -> None:
@@ -22,7 +22,7 @@ def build_play_body(
     Spotify accepts either context_uri OR uris (list) OR a single track_uri as [uris].
     """
     # exactly one of (context_uri, uris, track_uri) may be provided
-    provided = sum(x is not None for x in (context_uri, uris, track_uri))
+    provided = (context_uri is not None) + (uris is not None) + (track_uri is not None)
     if provided == 0:
         # legal: empty body => resume on current context
         body = {}
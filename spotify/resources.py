@@ -1,35 +1,36 @@
 # spotify/resources.py
 """MCP resources for Spotify data."""
 
-import json
+import asyncio
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 
 from . import auth as sa
 from .client import spotify_request
-from .devices import fetch_devices_data
+from .devices import fetch_devices_json
 
 
 def register_resources(mcp: FastMCP) -> None:
     """Register all Spotify MCP resources."""
     
     @mcp.resource("spotify://auth/status")
-    def auth_status() -> str:
+    async def auth_status() -> str:
         """
         Shows whether tokens.json is present and when it expires.
         (Use spotify_begin_login in your setup script/flow to obtain tokens first.)
         """
-        toks = sa.load_tokens()
+        toks = await asyncio.to_thread(sa.load_tokens)
         if not toks:
             return "missing"
-        return json.dumps(
+        return orjson.dumps(
             {
                 "status": "authorized",
                 "scopes": toks.get("scopes"),
                 "expires_at": toks.get("expires_at"),
             },
-            indent=2,
-        )
+            option=orjson.OPT_INDENT_2,
+        ).decode()
 
     @mcp.resource("spotify://devices")
     async def devices() -> str:
@@ -38,18 +39,7 @@ def register_resources(mcp: FastMCP) -> None:
         Uses cached device data for better performance.
         """
         try:
-            device_list = await fetch_devices_data()
-            out = [
-                {
-                    "id": d.id,
-                    "name": d.name,
-                    "is_active": d.is_active,
-                    "volume_percent": d.volume_percent,
-                    "type": d.type,
-                }
-                for d in device_list
-            ]
-            return json.dumps(out, indent=2)
+            return (await fetch_devices_json()).decode()
         except RuntimeError as e:
             return f"error: {str(e)}"
 
@@ -62,7 +52,7 @@ def register_resources(mcp: FastMCP) -> None:
         if r.status_code != 200:
             return f"error: {r.status_code} {r.text}"
         
-        data = r.json() or {}
+        data = orjson.loads(r.content) or {}
         item = data.get("item") or {}
         slim = {
             "is_playing": data.get("is_playing"),
@@ -76,4 +66,4 @@ def register_resources(mcp: FastMCP) -> None:
                 "duration_ms": item.get("duration_ms"),
             } if item else None,
         }
-        return json.dumps(slim, indent=2)
+        return orjson.dumps(slim, option=orjson.OPT_INDENT_2).decode()
@@ -1,11 +1,17 @@
 # spotify/search.py
 """Search functionality for Spotify Web API."""
 
+from operator import itemgetter
 from typing import Dict, List
 
+import orjson
+
 from .client import spotify_request
 
 
+_get_fields = itemgetter("uri", "name", "album", "duration_ms", "artists")
+
+
 async def search_tracks(q: str, limit: int = 5) -> List[Dict]:
     """
     Search for tracks on Spotify.
@@ -16,16 +22,23 @@ async def search_tracks(q: str, limit: int = 5) -> List[Dict]:
     if r.status_code != 200:
         raise RuntimeError(f"search failed: {r.status_code} {r.text}")
     
-    items = (r.json().get("tracks") or {}).get("items", []) or []
+    items = (orjson.loads(r.content).get("tracks") or {}).get("items", []) or []
     
     # return small, readable dictionaries
-    return [
-        {
-            "uri": it["uri"],
-            "name": it["name"],
-            "artist": ", ".join(a["name"] for a in it.get("artists", [])),
-            "album": (it.get("album") or {}).get("name"),
-            "duration_ms": it.get("duration_ms"),
-        }
-        for it in items
-    ]
+    join = ", ".join
+    tracks = []
+    for it in items:
+        try:
+            uri, name, album, duration_ms, artists = _get_fields(it)
+        except KeyError:
+            # optional fields missing - fall back to per-key lookups
+            uri, name = it["uri"], it["name"]
+            album, duration_ms, artists = it.get("album"), it.get("duration_ms"), it.get("artists")
+        tracks.append({
+            "uri": uri,
+            "name": name,
+            "artist": join([a["name"] for a in artists or ()]),
+            "album": (album or {}).get("name"),
+            "duration_ms": duration_ms,
+        })
+    return tracks
@@ -1,16 +1,19 @@
 # spotify/tools.py
 """MCP tools for Spotify playback control."""
 
-import json
+import logging
 from typing import List, Optional
 
+import orjson
 from mcp.server.fastmcp import FastMCP
 
 from .client import spotify_request
-from .devices import get_active_device_id
+from .devices import resolve_active_device_id
 from .playback import build_play_body, PlayArgsError
 from .search import search_tracks
 
+logger = logging.getLogger(__name__)
+
 
 def register_tools(mcp: FastMCP) -> None:
     """Register all Spotify MCP tools."""
@@ -21,10 +24,12 @@ def register_tools(mcp: FastMCP) -> None:
         Pause playback on the active device.
         Returns human-readable status; handles common Spotify errors explicitly.
         """
-        device_id = await get_active_device_id()
+        device_id = await resolve_active_device_id()
         params = {"device_id": device_id} if device_id else None
         r = await spotify_request("PUT", "/me/player/pause", params=params)
-        print(f"spotify_pause: {r.status_code} {r.text}")
+        # Only decode the body when it will actually be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("spotify_pause: %s %s", r.status_code, r.text)
 
         # Success: Spotify returns 204 No Content
         if r.status_code in [204, 200]:
@@ -64,7 +69,7 @@ def register_tools(mcp: FastMCP) -> None:
             return f"Invalid arguments: {e}"
 
         # choose device
-        dev = device_id or await get_active_device_id()
+        dev = device_id or await resolve_active_device_id()
         params = {"device_id": dev} if dev else None
 
         r = await spotify_request("PUT", "/me/player/play", params=params, json_body=body if body else None)
@@ -94,7 +99,7 @@ def register_tools(mcp: FastMCP) -> None:
         Use first result with spotify_play(track_uri=...).
         """
         results = await search_tracks(q=q, limit=limit)
-        return json.dumps(results, indent=2)
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
 
     @mcp.tool()
     def ping() -> str:
@@ -1,15 +1,16 @@
-import asyncio, httpx, json
+import asyncio
 import spotify.auth as auth
+from spotify.client import close_client, get_client
 
 async def main():
     env = auth.load_env()
     token = await auth.get_access_token(env["CLIENT_ID"], env["CLIENT_SECRET"])
-    async with httpx.AsyncClient() as client:
-        r = await client.get(
-            "https://api.spotify.com/v1/me",
-            headers={"Authorization": f"Bearer {token}"}
-        )
+    try:
+        r = await get_client().get("/me", headers={"Authorization": f"Bearer {token}"})
         print(r.status_code, r.json()["display_name"])
+    finally:
+        await close_client()
+        await auth.close_accounts_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
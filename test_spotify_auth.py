@@ -2,16 +2,78 @@
 import os
 import json
 import time
+import asyncio
+import threading
+from urllib.parse import parse_qs
+from unittest.mock import AsyncMock
+import httpx
 import pytest
 import spotify.auth as auth
 
-# Ensure pytest-asyncio is active for async test support
-pytestmark = pytest.mark.asyncio
+# tokens.json payload; tests fill in expires_at
+_TOKEN_TEMPLATE = {
+    "access_token": "stored_token",
+    "refresh_token": "dummy_refresh",
+    "scopes": auth.SCOPES,
+}
 
-@pytest.mark.asyncio
-async def test_exchange_code_for_token_invalid_secret(monkeypatch):
+@pytest.mark.parametrize("status", [400, 401])
+async def test_exchange_code_for_token_invalid_secret(httpx_mock, env, status):
+    # Spotify rejects bad client credentials; mocked so no request leaves the process
+    httpx_mock.add_response(
+        url="https://accounts.spotify.com/api/token",
+        method="POST",
+        status_code=status,
+        json={"error": "invalid_client"},
+    )
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        await auth.exchange_code_for_token(
+            "dummy_code", env["CLIENT_ID"], "WRONG_SECRET", env["REDIRECT_URI"]
+        )
+    resp = excinfo.value.response
+    assert resp.status_code == status
+    assert resp.text
+
+def _token_endpoint(env):
+    # Mimics Spotify's token endpoint: checks credentials, then redirect URI, then the code
+    expected_auth = f"Basic {auth.b64_client_creds(env['CLIENT_ID'], env['CLIENT_SECRET'])}"
+    def respond(request):
+        form = parse_qs(request.content.decode())
+        if request.headers["Authorization"] != expected_auth:
+            return httpx.Response(401, json={"error": "invalid_client"})
+        if form["redirect_uri"] != [env["REDIRECT_URI"]]:
+            return httpx.Response(400, json={"error": "invalid_grant", "error_description": "Invalid redirect URI"})
+        return httpx.Response(400, json={"error": "invalid_grant", "error_description": "Invalid authorization code"})
+    return respond
+
+async def test_exchange_code_for_token_rejects_bad_requests(httpx_mock, env):
+    httpx_mock.add_callback(
+        _token_endpoint(env),
+        url="https://accounts.spotify.com/api/token",
+        method="POST",
+        is_reusable=True,
+    )
+    # (code, client secret, redirect URI, expected status)
+    cases = [
+        ("dummy_code", "WRONG_SECRET", env["REDIRECT_URI"], 401),
+        ("dummy_code", env["CLIENT_SECRET"], "http://127.0.0.1:9999/wrong", 400),
+        ("bad_code", env["CLIENT_SECRET"], env["REDIRECT_URI"], 400),
+    ]
+    # independent requests, so overlap them instead of awaiting one by one
+    results = await asyncio.gather(
+        *[
+            auth.exchange_code_for_token(code, env["CLIENT_ID"], secret, redirect_uri)
+            for code, secret, redirect_uri, _ in cases
+        ],
+        return_exceptions=True,
+    )
+    for (*_, status), result in zip(cases, results):
+        assert isinstance(result, httpx.HTTPStatusError)
+        assert result.response.status_code == status
+
+@pytest.mark.live
+async def test_exchange_code_for_token_invalid_secret_live(monkeypatch, env, preserve_tokens):
     # Use a dummy code and intentionally wrong secret
-    env = auth.load_env()
     wrong_secret = "WRONG_SECRET"
     # Use a dummy code that will fail
     code = "dummy_code"
@@ -22,38 +84,73 @@ async def test_exchange_code_for_token_invalid_secret(monkeypatch):
     # Should be an httpx.HTTPStatusError with response
     assert hasattr(excinfo.value, 'response')
     resp = excinfo.value.response
-    assert resp.status_code == 400 or resp.status_code == 401
+    assert resp.status_code in (400, 401)
     assert resp.text
-    return resp
-
-@pytest.mark.asyncio
-async def test_get_access_token_refresh(monkeypatch, tmp_path):
-    # Setup: Write a tokens.json with expired access token
-    env = auth.load_env()
-    tokens_path = auth.TOKENS_PATH
-    # Backup original tokens.json
-    if os.path.exists(tokens_path):
-        os.rename(tokens_path, tokens_path + ".bak")
-    try:
-        # Write expired tokens
-        tokens = {
-            "access_token": "expired",
-            "refresh_token": os.environ.get("SPOTIFY_REFRESH_TOKEN", "dummy_refresh"),
-            "expires_at": int(time.time()) - 1,
-            "scopes": auth.SCOPES,
-        }
-        with open(tokens_path, "w", encoding="utf-8") as f:
-            json.dump(tokens, f)
-        # Patch refresh_access_token to check if called
-        called = {}
-        async def fake_refresh(tokens, cid, csec):
-            called["yes"] = True
-            return "new_token"
-        monkeypatch.setattr(auth, "refresh_access_token", fake_refresh)
-        token = await auth.get_access_token(env["CLIENT_ID"], env["CLIENT_SECRET"])
+
+# expired, still valid but inside the early-refresh window, and outside it
+@pytest.mark.parametrize("expires_in, refreshes", [(-1, True), (30, True), (120, False)])
+async def test_get_access_token_refresh(monkeypatch, tokens_path, env, test_secrets, expires_in, refreshes):
+    # Setup: Write a tokens.json whose access token expires expires_in seconds from now
+    tokens = dict(
+        _TOKEN_TEMPLATE,
+        refresh_token=test_secrets.refresh_token,
+        expires_at=int(time.time()) + expires_in,
+    )
+    with open(tokens_path, "w", encoding="utf-8") as f:
+        json.dump(tokens, f)
+    # Patch refresh_access_token to check if called
+    fake_refresh = AsyncMock(return_value="new_token")
+    monkeypatch.setattr(auth, "refresh_access_token", fake_refresh)
+    token = await auth.get_access_token(env["CLIENT_ID"], env["CLIENT_SECRET"])
+    if refreshes:
         assert token == "new_token"
-        assert called["yes"]
+        fake_refresh.assert_awaited_once()
+    else:
+        assert token == "stored_token"
+        fake_refresh.assert_not_awaited()
+
+async def test_get_access_token_picks_up_new_login(monkeypatch, tokens_path, env):
+    # auth_server_standalone.py writes tokens.json from another process
+    monkeypatch.setattr(auth, "TOKENS_RECHECK_SECONDS", 0)
+    expires_at = int(time.time()) + 3600
+    tokens_path.write_text(json.dumps({"access_token": "old", "refresh_token": "r", "expires_at": expires_at}))
+    assert await auth.get_access_token(env["CLIENT_ID"], env["CLIENT_SECRET"]) == "old"
+    tokens_path.write_text(json.dumps({"access_token": "new", "refresh_token": "r", "expires_at": expires_at}))
+    # make sure the rewrite is visible even on filesystems with coarse timestamps
+    mtime = tokens_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(tokens_path, ns=(mtime, mtime))
+    assert await auth.get_access_token(env["CLIENT_ID"], env["CLIENT_SECRET"]) == "new"
+
+@pytest.mark.parametrize("expires_in, stats", [(3600, 1), (30, 3)])
+async def test_current_tokens_throttles_stat(monkeypatch, tokens_path, expires_in, stats):
+    # a good cached token is served without touching the disk between rechecks;
+    # one that is due for refresh is rechecked every time
+    auth.save_tokens(dict(_TOKEN_TEMPLATE, expires_at=int(time.time()) + expires_in))
+    calls = []
+    real_file_mtime = auth._file_mtime
+    monkeypatch.setattr(auth, "_file_mtime", lambda: calls.append(1) or real_file_mtime())
+    for _ in range(3):
+        assert (await auth.current_tokens())["access_token"] == "stored_token"
+    assert len(calls) == stats
+
+def test_load_tokens_during_rewrite(tokens_path):
+    # the auth server (or a refresh's worker thread) rewriting tokens.json
+    # must never hand a concurrent reader a torn file
+    versions = [dict(_TOKEN_TEMPLATE, access_token="t" * n, expires_at=n) for n in (1, 5000)]
+    auth.save_tokens(versions[0])
+    stop = threading.Event()
+
+    def rewrite():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            auth.save_tokens(versions[n % 2])
+
+    writer = threading.Thread(target=rewrite)
+    writer.start()
+    try:
+        for _ in range(500):
+            assert auth.load_tokens() in versions
     finally:
-        # Restore original tokens.json
-        if os.path.exists(tokens_path + ".bak"):
-            os.replace(tokens_path + ".bak", tokens_path)
+        stop.set()
+        writer.join()
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import asyncio
+import itertools
+import httpx
+import pytest
+import pytest_asyncio
+import spotify.auth as auth
+import spotify.client as client
+
+# distinct, increasing mtimes so every rewrite is visible even on coarse-timestamp filesystems
+_mtimes = itertools.count(time.time_ns(), 1_000_000_000)
+
+def _write_tokens(path, access_token):
+    path.write_text(json.dumps({
+        "access_token": access_token,
+        "refresh_token": "dummy_refresh",
+        "expires_at": int(time.time()) + 3600,
+    }))
+    mtime = next(_mtimes)
+    os.utime(path, ns=(mtime, mtime))
+
+async def test_bearer_headers_follow_tokens_on_disk(monkeypatch, tokens_path):
+    # look at the file on every call so each rewrite below is seen immediately
+    monkeypatch.setattr(auth, "TOKENS_RECHECK_SECONDS", 0)
+    monkeypatch.setattr(client, "_cached_headers", None)
+    monkeypatch.setattr(client, "_cached_token", None)
+    _write_tokens(tokens_path, "first")
+    assert (await client.bearer_headers())["Authorization"] == "Bearer first"
+    # re-running login rewrites tokens.json from another process
+    _write_tokens(tokens_path, "second")
+    assert (await client.bearer_headers())["Authorization"] == "Bearer second"
+    # the auth status resource reloads the file itself; headers must agree with it
+    _write_tokens(tokens_path, "third")
+    auth.load_tokens()
+    assert (await client.bearer_headers())["Authorization"] == "Bearer third"
+
+
+@pytest.mark.parametrize("reload_mid_refresh", [False, True])
+async def test_bearer_headers_refresh_once(monkeypatch, httpx_mock, tokens_path, env, reload_mid_refresh):
+    # concurrent callers with a token inside the skew window share one refresh,
+    # even if tokens.json is reloaded (e.g. by the auth status resource) meanwhile
+    monkeypatch.setattr(client, "CLIENT_ID", env["CLIENT_ID"])
+    monkeypatch.setattr(client, "CLIENT_SECRET", env["CLIENT_SECRET"])
+    monkeypatch.setattr(client, "_cached_headers", None)
+    monkeypatch.setattr(client, "_cached_token", None)
+    auth.save_tokens({"access_token": "old", "refresh_token": "r", "expires_at": int(time.time()) + 30})
+    refreshing = asyncio.Event()
+    async def token_endpoint(request):
+        refreshing.set()
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"access_token": "new", "expires_in": 3600, "refresh_token": "rotated"})
+    httpx_mock.add_callback(
+        token_endpoint,
+        url="https://accounts.spotify.com/api/token",
+        method="POST",
+        is_reusable=True,
+    )
+    first = asyncio.create_task(client.bearer_headers())
+    await refreshing.wait()
+    if reload_mid_refresh:
+        await asyncio.to_thread(auth.load_tokens)
+    results = await asyncio.gather(first, *[client.bearer_headers() for _ in range(5)])
+    assert [h["Authorization"] for h in results] == ["Bearer new"] * 6
+    assert len(httpx_mock.get_requests()) == 1
+    assert auth.load_tokens()["refresh_token"] == "rotated"
+
+@pytest_asyncio.fixture
+async def api(monkeypatch):
+    # route spotify_request through a mock transport; tests append responses
+    responses = []
+    def handler(request):
+        return responses.pop(0)
+    async def no_auth():
+        return {}
+    monkeypatch.setattr(client, "bearer_headers", no_auth)
+    async with httpx.AsyncClient(
+        base_url=client.SPOTIFY_API, transport=httpx.MockTransport(handler)
+    ) as mock_client:
+        monkeypatch.setattr(client, "_client", mock_client)
+        monkeypatch.setattr(client, "_blocked_until", 0.0)
+        yield responses
+
+async def test_spotify_request_retries_after_429(api):
+    api += [httpx.Response(429, headers={"Retry-After": "0.05"}), httpx.Response(200)]
+    r = await client.spotify_request("GET", "/me")
+    assert r.status_code == 200
+    assert not api
+    assert client._rate_gate.is_set()
+
+async def test_spotify_request_waits_out_short_pause(api):
+    api += [httpx.Response(429, headers={"Retry-After": "0.05"}), httpx.Response(200), httpx.Response(200)]
+    first = asyncio.create_task(client.spotify_request("GET", "/me"))
+    while client._rate_gate.is_set():
+        await asyncio.sleep(0)
+    # issued while the pause is in force: held at the gate, then sent
+    start = time.monotonic()
+    second = await client.spotify_request("GET", "/me/player")
+    assert time.monotonic() - start >= 0.04
+    assert second.status_code == 200
+    assert (await first).status_code == 200
+    assert not api
+
+async def test_spotify_request_blocks_during_long_retry_after(api):
+    api.append(httpx.Response(429, headers={"Retry-After": "3600"}))
+    start = time.monotonic()
+    r = await client.spotify_request("GET", "/me")
+    assert r.status_code == 429
+    # later tool calls fail fast without reaching Spotify (the mock has no responses left)
+    r = await client.spotify_request("GET", "/me/player")
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 3500
+    assert r.request.url.path == "/v1/me/player"
+    assert time.monotonic() - start < 1
@@ -0,0 +1,102 @@
+import asyncio
+import types
+import httpx
+import pytest
+import spotify.devices as devices
+
+_DEVICES = {"devices": [
+    {"id": "speaker", "name": "Speaker", "is_active": False, "type": "Speaker"},
+    {"id": "phone", "name": "Phone", "is_active": True, "type": "Smartphone"},
+]}
+
+@pytest.fixture
+def api(monkeypatch):
+    # fake spotify_request: records paths, answers from per-path tables
+    api = types.SimpleNamespace(
+        calls=[],
+        routes={"/me/player/devices": httpx.Response(200, json=_DEVICES)},
+        delays={},
+    )
+    async def fake_request(method, path, **kwargs):
+        api.calls.append(path)
+        await asyncio.sleep(api.delays.get(path, 0.01))
+        return api.routes[path]
+    monkeypatch.setattr(devices, "spotify_request", fake_request)
+    monkeypatch.setattr(devices, "_devices_cache", devices.DevicesCache())
+    return api
+
+def _age_cache(seconds):
+    devices._devices_cache._last_fetch -= seconds
+
+async def test_stale_read_refresh_ignores_non_json_body(api):
+    await devices.fetch_devices_data()
+    api.routes["/me/player/devices"] = httpx.Response(200, content=b"<html>oops</html>")
+    _age_cache(devices._devices_cache.soft_ttl)
+    stale = await devices.fetch_devices_data()
+    await asyncio.wait([devices._devices_cache._refresh_task])
+    assert [d.id for d in stale] == ["speaker", "phone"]
+    assert devices._devices_cache._refresh_task is None
+
+@pytest.mark.parametrize("body", [[1], {"devices": [1]}, {"devices": "x"}])
+async def test_refresh_rejects_unexpected_payload(api, body):
+    api.routes["/me/player/devices"] = httpx.Response(200, json=body)
+    with pytest.raises(RuntimeError, match="unexpected payload"):
+        await devices.fetch_devices_data()
+
+async def test_expired_read_waits_for_running_refresh(api):
+    await devices.fetch_devices_data()
+    _age_cache(devices._devices_cache.soft_ttl)
+    await devices.fetch_devices_data()  # starts the background refresh
+    _age_cache(devices._devices_cache.hard_ttl)
+    await devices.fetch_devices_data()
+    assert api.calls == ["/me/player/devices", "/me/player/devices"]
+    assert not devices._devices_cache.is_expired()
+
+async def test_expired_read_surfaces_error_of_running_refresh(api):
+    await devices.fetch_devices_data()
+    api.routes["/me/player/devices"] = httpx.Response(500, text="boom")
+    _age_cache(devices._devices_cache.soft_ttl)
+    await devices.fetch_devices_data()  # starts the background refresh
+    _age_cache(devices._devices_cache.hard_ttl)
+    with pytest.raises(RuntimeError, match="500"):
+        await devices.fetch_devices_data()
+    # the failed refresh is not retried with a second request
+    assert api.calls == ["/me/player/devices", "/me/player/devices"]
+
+async def test_race_won_by_player_still_warms_cache(api):
+    api.routes["/me/player"] = httpx.Response(200, json={"device": {"id": "phone"}})
+    api.delays["/me/player/devices"] = 0.05
+    assert await devices.resolve_active_device_id() == "phone"
+    await devices._devices_cache._refresh_task
+    assert not devices._devices_cache.is_expired()
+    # later calls are cache hits
+    assert await devices.resolve_active_device_id() == "phone"
+    assert await devices.resolve_active_device_id() == "phone"
+    assert sorted(api.calls) == ["/me/player", "/me/player/devices"]
+
+async def test_race_falls_back_to_devices_list(api):
+    api.routes["/me/player"] = httpx.Response(204)
+    assert await devices.resolve_active_device_id() == "phone"
+    assert sorted(api.calls) == ["/me/player", "/me/player/devices"]
+    assert not devices._devices_cache.is_expired()
+
+async def test_race_raises_devices_error_without_refetching(api):
+    api.routes["/me/player/devices"] = httpx.Response(500, text="boom")
+    api.routes["/me/player"] = httpx.Response(204)
+    with pytest.raises(RuntimeError, match="500"):
+        await devices.resolve_active_device_id()
+    assert sorted(api.calls) == ["/me/player", "/me/player/devices"]
+
+async def test_concurrent_cold_races_share_requests(api):
+    api.routes["/me/player"] = httpx.Response(200, json={"device": {"id": "phone"}})
+    api.delays["/me/player/devices"] = 0.05
+    results = await asyncio.gather(*[devices.resolve_active_device_id() for _ in range(3)])
+    assert results == ["phone"] * 3
+    await devices._devices_cache._refresh_task
+    assert sorted(api.calls) == ["/me/player", "/me/player/devices"]
+
+async def test_race_logs_unexpected_player_error(api, caplog):
+    api.routes["/me/player"] = object()  # not a Response: AttributeError in the lookup
+    api.delays["/me/player/devices"] = 0.05
+    assert await devices.resolve_active_device_id() == "phone"
+    assert "player lookup failed" in caplog.text
@@ -0,0 +1,29 @@
+import httpx
+import spotify.search as search
+
+_ITEMS = [
+    {
+        "uri": "spotify:track:1",
+        "name": "Full",
+        "album": {"name": "Album"},
+        "duration_ms": 1000,
+        "artists": [{"name": "A"}, {"name": "B"}],
+    },
+    # optional fields missing - takes the per-key fallback
+    {"uri": "spotify:track:2", "name": "Bare"},
+    {"uri": "spotify:track:3", "name": "No artists", "album": None, "duration_ms": 2000, "artists": None},
+]
+
+async def test_search_tracks_projects_items(monkeypatch):
+    calls = []
+    async def fake_request(method, path, **kwargs):
+        calls.append((method, path, kwargs["params"]))
+        return httpx.Response(200, json={"tracks": {"items": _ITEMS}})
+    monkeypatch.setattr(search, "spotify_request", fake_request)
+    tracks = await search.search_tracks("query", limit=3)
+    assert calls == [("GET", "/search", {"q": "query", "type": "track", "limit": 3})]
+    assert tracks == [
+        {"uri": "spotify:track:1", "name": "Full", "artist": "A, B", "album": "Album", "duration_ms": 1000},
+        {"uri": "spotify:track:2", "name": "Bare", "artist": "", "album": None, "duration_ms": None},
+        {"uri": "spotify:track:3", "name": "No artists", "artist": "", "album": None, "duration_ms": 2000},
+    ]